@@ -35,6 +35,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -81,21 +82,62 @@ CELERY_TIMEZONE = 'UTC'
 
 # OpenAI
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
+OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '60'))
+OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', '10'))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('OPENAI_MAX_KEEPALIVE_CONNECTIONS', '5'))
 
 # File uploads
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Deck page previews
+PREVIEW_CACHE_DIR = Path(os.getenv('PREVIEW_CACHE_DIR', BASE_DIR / 'preview_cache'))
+PREVIEW_CACHE_MAX_BYTES = int(os.getenv('PREVIEW_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+PREVIEW_WIDTHS = [320, 640, 1280]
+PREVIEW_DEFAULT_WIDTH = 640
+PREVIEW_PREWARM_PAGES = int(os.getenv('PREVIEW_PREWARM_PAGES', '3'))  # 0 disables
+
+# Near-duplicate deck detection (MinHash + LSH)
+# MINHASH_BANDS must divide MINHASH_NUM_PERM. With 32 bands of 4 rows a deck
+# at Jaccard s becomes a candidate with probability 1 - (1 - s^4)^32: about
+# 99% at 0.6 but 87% at 0.5 and 38% at 0.35, so thresholds below
+# NEAR_DUPLICATE_MIN_THRESHOLD silently miss matches and are rejected.
+MINHASH_NUM_PERM = int(os.getenv('MINHASH_NUM_PERM', '128'))
+MINHASH_BANDS = int(os.getenv('MINHASH_BANDS', '32'))
+MINHASH_SHINGLE_SIZE = int(os.getenv('MINHASH_SHINGLE_SIZE', '5'))
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.8'))
+NEAR_DUPLICATE_MIN_THRESHOLD = 0.6
+
+# Comparable-deal search (embeddings of technology_description)
+# OpenAI embeddings whenever an API key is configured; the hashing embedder is
+# a deterministic local stand-in for development without a key (and tests).
+DEAL_EMBEDDER = os.getenv(
+    'DEAL_EMBEDDER',
+    'deals.embeddings.OpenAIEmbedder' if OPENAI_API_KEY else 'deals.embeddings.HashingEmbedder',
+)
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
+EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS', '256'))
+EMBEDDING_INDEX_DIR = Path(os.getenv('EMBEDDING_INDEX_DIR', BASE_DIR / 'embedding_index'))
+
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.ORJSONRenderer',
+        'core.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
+# Compression (brotli if installed, else gzip) for responses at least this large
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+
 # CORS
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
@@ -0,0 +1,102 @@
+"""
+HTTP helpers for serving files.
+"""
+import re
+
+from django.http import HttpResponse, StreamingHttpResponse
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range `Range` header against a resource of `size` bytes.
+
+    Returns:
+        tuple[int, int] | None | False: Inclusive (start, end); None if the
+        header is absent, malformed or multi-range (serve the whole file);
+        False if the range is unsatisfiable.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if not length or not size:
+            return False
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size:
+        return False
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def ranged_file_response(request, file, size, content_type, etag=None):
+    """
+    Serve an open file, honouring single-range `Range` and `If-Range` headers.
+
+    The file is closed when the response is closed.
+    """
+    byte_range = parse_range(request.headers.get('Range'), size)
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range != etag:
+        byte_range = None
+
+    if byte_range is False:
+        file.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    else:
+        start, end = byte_range or (0, size - 1)
+        response = StreamingHttpResponse(
+            FileRangeIterator(file, start, end - start + 1),
+            content_type=content_type,
+            status=206 if byte_range else 200,
+        )
+        response['Content-Length'] = str(end - start + 1)
+        if byte_range:
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = etag
+    return response
+
+
+class FileRangeIterator:
+    """
+    Iterate over a byte range of a file in chunks.
+
+    Exposes close() so the response closes the file even if the body is never
+    iterated.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.start = start
+        self.length = length
+
+    def __iter__(self):
+        self.file.seek(self.start)
+        remaining = self.length
+        while remaining > 0:
+            chunk = self.file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+        self.close()
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,134 @@
+"""
+Benchmark API rendering and compression on list and detail endpoint output.
+
+Payloads are real DealListSerializer / DealDetailSerializer output for
+unsaved fixture deals (no database access), with generated, non-repeating
+prose for descriptions, founder backgrounds and investment theses.
+
+Usage:
+    python manage.py benchmark_api
+    python manage.py benchmark_api --iterations 500 --page-size 100
+"""
+import gzip
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from core.middleware import BROTLI_QUALITY, brotli
+from core.renderers import MessagePackRenderer, ORJSONRenderer
+from deals.models import Assessment, Deal, Founder
+from deals.serializers import DealDetailSerializer, DealListSerializer
+
+WORDS = (
+    "platform customers revenue growth market enterprise pipeline retention "
+    "underwriting lending credit risk model data proprietary workflow automation "
+    "clinical diagnostics hospital payer reimbursement regulatory approval trial "
+    "logistics warehouse robotics fleet routing latency throughput inventory "
+    "energy storage battery grid solar utility carbon emissions offset "
+    "security identity compliance audit cloud infrastructure developer api "
+    "marketplace supply demand liquidity take rate gross margin churn cohort "
+    "founder engineer scientist operator exit acquisition series seed round "
+    "pricing contract annual recurring expansion net dollar payback cac ltv "
+    "competition incumbent moat network effects distribution partnership channel "
+    "traction pilot deployment conversion onboarding usage engagement benchmark"
+).split()
+
+
+def prose(rng, sentences):
+    """Generate non-repeating pseudo-prose with realistic word statistics"""
+    out = []
+    for _ in range(sentences):
+        words = rng.choices(WORDS, k=rng.randint(8, 22))
+        if rng.random() < 0.4:
+            words.insert(rng.randrange(len(words)), f"{rng.randint(2, 950)}%")
+        out.append(' '.join(words).capitalize() + '.')
+    return ' '.join(out)
+
+
+def fixture_deal(rng, i):
+    """Build an unsaved, fully populated Deal with founders and assessment"""
+    now = timezone.now() - timedelta(minutes=i)
+    deal = Deal(
+        company_name=f"{rng.choice(WORDS).title()}{rng.choice(WORDS)} {i}",
+        status='completed',
+        website=f"https://company-{i}.example.com",
+        location=rng.choice(["San Francisco, CA", "New York, NY", "London, UK", "Berlin, DE"]),
+        technology_description=prose(rng, 6),
+        funding_ask=f"${rng.randint(1, 30)}M",
+        created_at=now,
+        updated_at=now,
+        processed_at=now,
+    )
+    deal._prefetched_objects_cache = {'founders': [
+        Founder(
+            id=i * 10 + n,
+            deal=deal,
+            name=f"Founder {i}-{n}",
+            title=rng.choice(["CEO", "CTO", "COO"]),
+            background=prose(rng, 3),
+            linkedin_url=f"https://linkedin.com/in/founder-{i}-{n}",
+            order=n,
+        )
+        for n in range(rng.randint(2, 4))
+    ]}
+    deal.assessment = Assessment(
+        deal=deal,
+        team_strength=rng.randint(1, 10),
+        market_opportunity=rng.randint(1, 10),
+        product_innovation=rng.randint(1, 10),
+        business_model=rng.randint(1, 10),
+        overall_score=round(rng.uniform(1, 10), 1),
+        strengths=[prose(rng, 1) for _ in range(4)],
+        concerns=[prose(rng, 1) for _ in range(3)],
+        investment_thesis=prose(rng, 24),
+    )
+    return deal
+
+
+class Command(BaseCommand):
+    help = "Benchmark JSON/orjson/MessagePack rendering and gzip/brotli sizes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        rng = random.Random(0)
+        deals = [fixture_deal(rng, i) for i in range(options['page_size'])]
+
+        renderers = [
+            ('json (stdlib)', JSONRenderer()),
+            ('orjson', ORJSONRenderer()),
+            ('msgpack', MessagePackRenderer()),
+        ]
+        payloads = [
+            ('list', {
+                'count': 100000,
+                'next': 'http://localhost:8000/api/deals/?page=2',
+                'previous': None,
+                'results': DealListSerializer(deals, many=True).data,
+            }),
+            ('detail', DealDetailSerializer(deals[0]).data),
+        ]
+
+        header = f"{'payload':<8} {'renderer':<14} {'us/render':>10} {'raw':>8} {'gzip':>8} {'br':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for payload_name, data in payloads:
+            for renderer_name, renderer in renderers:
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    body = renderer.render(data)
+                elapsed_us = (time.perf_counter() - start) / iterations * 1e6
+
+                gzipped = len(gzip.compress(body, compresslevel=6))
+                brotlied = len(brotli.compress(body, quality=BROTLI_QUALITY)) if brotli else '-'
+                self.stdout.write(
+                    f"{payload_name:<8} {renderer_name:<14} {elapsed_us:>10.1f} "
+                    f"{len(body):>8} {gzipped:>8} {brotlied:>8}"
+                )
@@ -0,0 +1,45 @@
+"""
+Paginators for very large tables.
+"""
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses the database's row estimate for unfiltered querysets.
+
+    COUNT(*) is a full scan on large tables. When the queryset has no WHERE
+    clause and the planner's estimate exceeds ``estimate_threshold``, the
+    estimate is used instead; otherwise (filtered querysets, small tables,
+    backends without statistics) the exact count is returned.
+    """
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = self._estimated_count()
+        if estimate is not None and estimate > self.estimate_threshold:
+            return estimate
+        return super().count
+
+    def _estimated_count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where or query.distinct or query.group_by:
+            return None
+
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [query.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if not row or row[0] < 0:
+            # reltuples is -1 for tables that have never been analyzed
+            return None
+        return row[0]
@@ -0,0 +1,63 @@
+"""
+Fast renderers for the REST API.
+
+ORJSONRenderer is a drop-in replacement for DRF's JSONRenderer and stays the
+default; MessagePackRenderer is only selected when a client sends
+``Accept: application/msgpack``.
+"""
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Fallback for types orjson/msgpack don't handle natively (Decimal, lazy
+# translation strings, querysets, ...), same rules as DRF's encoder.
+_default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renderer which serializes to JSON using orjson.
+
+    Output matches JSONRenderer for everything serializers produce, with two
+    float differences: non-finite values render as null instead of raising,
+    and large exponents are written without a sign (1e16, not 1e+16).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into JSON, returning a bytestring.
+        """
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        # Datetimes go through DRF's encoder ('Z' suffix, millisecond precision)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            # orjson only supports two-space indentation
+            option |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=_default, option=option)
+
+        # Match JSONRenderer: escape U+2028/U+2029 so output is a strict
+        # javascript subset.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renderer which serializes to MessagePack.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True)
+
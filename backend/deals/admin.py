@@ -1,17 +1,51 @@
 """
 Django admin configuration for deals.
+
+Changelists are built for very large tables: related deals are joined with
+list_select_related, counts use EstimatedCountPaginator without the extra
+full-table count, filters have static options (no DISTINCT scans), and deal
+foreign keys use autocomplete / raw-id widgets instead of full <select>s.
 """
 from django.contrib import admin
+from core.paginators import EstimatedCountPaginator
 from .models import Deal, Founder, Assessment
 
 
+class ScoreFilter(admin.SimpleListFilter):
+    """Filter on a 1-10 score field without querying for distinct values"""
+    parameter_name = None
+
+    def lookups(self, request, model_admin):
+        return [(str(score), str(score)) for score in range(1, 11)]
+
+    def queryset(self, request, queryset):
+        # Ignore values that aren't one of the offered scores
+        if self.value() in dict(self.lookup_choices):
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+
+def score_filter(field_name):
+    """Build a ScoreFilter subclass for the given Assessment field"""
+    return type(f'{field_name.title()}Filter', (ScoreFilter,), {
+        'title': field_name.replace('_', ' '),
+        'parameter_name': field_name,
+    })
+
+
+class ScaledModelAdmin(admin.ModelAdmin):
+    """Base admin with changelist settings for very large tables"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 @admin.register(Deal)
-class DealAdmin(admin.ModelAdmin):
+class DealAdmin(ScaledModelAdmin):
     list_display = ['company_name', 'status', 'created_at', 'processed_at']
     list_filter = ['status', 'created_at']
     search_fields = ['company_name', 'website', 'location']
     readonly_fields = ['id', 'created_at', 'updated_at', 'processed_at']
-    
+
     fieldsets = (
         ('Basic Info', {
             'fields': ('id', 'status', 'pitch_deck')
@@ -24,18 +58,33 @@ class DealAdmin(admin.ModelAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        # A replaced deck invalidates its content hash (and with it the cached
+        # previews and ETags keyed on it)
+        if 'pitch_deck' in form.changed_data:
+            obj.pitch_deck_sha256 = ''
+        super().save_model(request, obj, form, change)
+
 
 @admin.register(Founder)
-class FounderAdmin(admin.ModelAdmin):
+class FounderAdmin(ScaledModelAdmin):
     list_display = ['name', 'title', 'deal', 'order']
-    list_filter = ['deal']
+    list_select_related = ['deal']
     search_fields = ['name', 'title']
+    autocomplete_fields = ['deal']
+    ordering = ['-pk']
 
 
 @admin.register(Assessment)
-class AssessmentAdmin(admin.ModelAdmin):
+class AssessmentAdmin(ScaledModelAdmin):
     list_display = ['deal', 'overall_score', 'team_strength', 'market_opportunity', 'product_innovation', 'business_model']
-    list_filter = ['team_strength', 'market_opportunity', 'product_innovation', 'business_model']
+    list_select_related = ['deal']
+    list_filter = [
+        score_filter('team_strength'),
+        score_filter('market_opportunity'),
+        score_filter('product_innovation'),
+        score_filter('business_model'),
+    ]
+    raw_id_fields = ['deal']
     readonly_fields = ['created_at']
-
-
+    ordering = ['-pk']
@@ -0,0 +1,86 @@
+"""
+Pluggable text embedders for comparable-deal search.
+
+The embedder is selected with the DEAL_EMBEDDER setting (dotted path). Every
+embedder exposes `name`, `dimensions` and `embed(texts)`, returning an
+(n, dimensions) float32 array.
+"""
+import re
+import zlib
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .vector_index import VectorIndex
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedder using signed feature hashing of word unigrams
+    and bigrams. No network access; used in tests and when no API is configured.
+    """
+    name = 'hashing'
+
+    def __init__(self, dimensions):
+        self.dimensions = dimensions
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for i, text in enumerate(texts):
+            tokens = TOKEN_RE.findall(text.lower())
+            features = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+            if not features:
+                continue
+            hashes = np.fromiter(
+                (zlib.crc32(feature.encode()) for feature in features),
+                dtype=np.uint32,
+                count=len(features),
+            )
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix[i], hashes % self.dimensions, signs)
+        return matrix
+
+
+class OpenAIEmbedder:
+    """Embedder backed by the OpenAI embeddings API"""
+
+    def __init__(self, dimensions):
+        self.dimensions = dimensions
+        self.name = settings.EMBEDDING_MODEL
+
+    def embed(self, texts):
+        from .services import get_openai_client
+
+        client = get_openai_client()
+        if client is None:
+            raise RuntimeError("OpenAI client is not configured")
+        response = client.embeddings.create(
+            model=self.name,
+            input=list(texts),
+            dimensions=self.dimensions,
+        )
+        return np.array([item.embedding for item in response.data], dtype=np.float32)
+
+
+@lru_cache(maxsize=None)
+def _load_embedder(path, dimensions):
+    return import_string(path)(dimensions)
+
+
+def get_embedder():
+    """Return the configured embedder instance"""
+    return _load_embedder(settings.DEAL_EMBEDDER, settings.EMBEDDING_DIMENSIONS)
+
+
+@lru_cache(maxsize=None)
+def _load_index(path, dimensions):
+    return VectorIndex(path, dimensions)
+
+
+def get_vector_index():
+    """Return this process's index over the configured index directory"""
+    return _load_index(str(settings.EMBEDDING_INDEX_DIR), settings.EMBEDDING_DIMENSIONS)
@@ -0,0 +1,152 @@
+"""
+Streaming export of deals with their assessments and founders.
+
+Rows are produced from a server-side iterator and encoded in small chunks, so
+memory stays flat regardless of table size and a client disconnect stops the
+query at the next chunk boundary.
+"""
+import csv
+import io
+import logging
+
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FIELDS = [
+    'id',
+    'company_name',
+    'status',
+    'website',
+    'location',
+    'funding_ask',
+    'technology_description',
+    'founders',
+    'team_strength',
+    'market_opportunity',
+    'product_innovation',
+    'business_model',
+    'overall_score',
+    'strengths',
+    'concerns',
+    'investment_thesis',
+    'created_at',
+    'processed_at',
+]
+
+ASSESSMENT_FIELDS = [
+    'team_strength',
+    'market_opportunity',
+    'product_innovation',
+    'business_model',
+    'overall_score',
+    'strengths',
+    'concerns',
+    'investment_thesis',
+]
+
+# Rows fetched per database round trip (and per founders prefetch query)
+ITERATOR_CHUNK_SIZE = 2000
+
+# Approximate bytes buffered before a chunk is handed to the server
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Leading characters spreadsheets treat as the start of a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def export_queryset(queryset):
+    """Join assessments and founders onto a Deal queryset for export"""
+    return (
+        queryset
+        .select_related('assessment')
+        .prefetch_related('founders')
+        .defer('minhash_signature')
+    )
+
+
+def iter_export_rows(queryset):
+    """
+    Yield one dict per deal, with founder names aggregated into a list.
+
+    Uses QuerySet.iterator() so results are streamed from the database cursor
+    and founders are prefetched per chunk rather than for the whole table.
+    """
+    for deal in queryset.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        row = {
+            'id': deal.id,
+            'company_name': deal.company_name,
+            'status': deal.status,
+            'website': deal.website,
+            'location': deal.location,
+            'funding_ask': deal.funding_ask,
+            'technology_description': deal.technology_description,
+            'founders': [founder.name for founder in deal.founders.all()],
+            'created_at': deal.created_at,
+            'processed_at': deal.processed_at,
+        }
+        assessment = getattr(deal, 'assessment', None)
+        for field in ASSESSMENT_FIELDS:
+            row[field] = getattr(assessment, field) if assessment else None
+        yield row
+
+
+def escape_formula(value):
+    """Quote a string cell so spreadsheets don't evaluate it as a formula"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def stream_csv(rows):
+    """Encode export rows as CSV, list values joined with '; '"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for row in rows:
+        for key in ('founders', 'strengths', 'concerns'):
+            if row[key] is not None:
+                row[key] = '; '.join(str(item) for item in row[key])
+        writer.writerow({key: escape_formula(value) for key, value in row.items()})
+        if buffer.tell() >= STREAM_CHUNK_SIZE:
+            yield _drain(buffer)
+    if buffer.tell():
+        yield _drain(buffer)
+
+
+def stream_ndjson(rows):
+    """Encode export rows as newline-delimited JSON"""
+    buffer = io.BytesIO()
+    default = DjangoJSONEncoder().default
+    for row in rows:
+        buffer.write(orjson.dumps(row, default=default, option=orjson.OPT_APPEND_NEWLINE))
+        if buffer.tell() >= STREAM_CHUNK_SIZE:
+            yield _drain(buffer)
+    if buffer.tell():
+        yield _drain(buffer)
+
+
+def closing_stream(chunks, rows):
+    """
+    Wrap an encoder so the row iterator is closed however streaming ends.
+
+    The WSGI server (or Django's ASGI handler) closes the response when the
+    client disconnects; closing the row generator releases the database cursor
+    immediately instead of when the generator is garbage collected.
+    """
+    completed = False
+    try:
+        yield from chunks
+        completed = True
+    finally:
+        rows.close()
+        if not completed:
+            logger.info("Deal export stopped before completion (client disconnected)")
+
+
+def _drain(buffer):
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
@@ -0,0 +1,63 @@
+"""
+Benchmark top-K cosine queries against a synthetic comparable-deals index.
+
+Usage:
+    python manage.py benchmark_vector_index
+    python manage.py benchmark_vector_index --rows 500000 --queries 50
+"""
+import tempfile
+import time
+import uuid
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from deals.vector_index import VectorIndex
+
+
+class Command(BaseCommand):
+    help = "Time top-K cosine queries over N random embeddings"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500000)
+        parser.add_argument('--dimensions', type=int, default=settings.EMBEDDING_DIMENSIONS)
+        parser.add_argument('--queries', type=int, default=20)
+        parser.add_argument('-k', type=int, default=10)
+
+    def handle(self, *args, **options):
+        rows, dimensions = options['rows'], options['dimensions']
+        rng = np.random.default_rng(0)
+
+        with tempfile.TemporaryDirectory() as path:
+            index = VectorIndex(path, dimensions)
+            start = time.perf_counter()
+            index.rebuild(
+                (uuid.UUID(int=i), rng.standard_normal(dimensions, dtype=np.float32))
+                for i in range(rows)
+            )
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            index.refresh()
+            load = time.perf_counter() - start
+
+            timings = []
+            for _ in range(options['queries']):
+                query = rng.standard_normal(dimensions, dtype=np.float32)
+                start = time.perf_counter()
+                index.search(query, k=options['k'])
+                timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            index.append(uuid.uuid4(), rng.standard_normal(dimensions, dtype=np.float32))
+            index.refresh()
+            append = time.perf_counter() - start
+
+        timings_ms = np.array(timings) * 1000
+        self.stdout.write(f"rows={rows} dimensions={dimensions} k={options['k']}")
+        self.stdout.write(f"build {build:.2f}s, load {load:.2f}s, append+refresh {append * 1000:.2f}ms")
+        self.stdout.write(
+            f"query p50 {np.percentile(timings_ms, 50):.1f}ms, "
+            f"p95 {np.percentile(timings_ms, 95):.1f}ms"
+        )
@@ -0,0 +1,34 @@
+"""
+Rebuild the on-disk comparable-deals vector index from the DealEmbedding table.
+
+Usage:
+    python manage.py rebuild_embedding_index
+"""
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from deals.embeddings import get_embedder, get_vector_index
+from deals.models import DealEmbedding
+
+
+class Command(BaseCommand):
+    help = "Rebuild the comparable-deals vector index from stored embeddings"
+
+    def handle(self, *args, **options):
+        embedder = get_embedder()
+        embeddings = (
+            DealEmbedding.objects
+            .filter(model_name=embedder.name, dimensions=embedder.dimensions)
+            .values_list('deal_id', 'vector')
+            .iterator(chunk_size=2000)
+        )
+        count = 0
+
+        def items():
+            nonlocal count
+            for deal_id, vector in embeddings:
+                count += 1
+                yield deal_id, np.frombuffer(bytes(vector), dtype='<f4')
+
+        get_vector_index().rebuild(items())
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} embeddings"))
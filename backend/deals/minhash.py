@@ -0,0 +1,117 @@
+"""
+MinHash signatures and LSH banding for near-duplicate deck detection.
+
+Text is split into word k-shingles, each shingle is hashed to 32 bits, and the
+signature is the minimum of ``num_perm`` universal hash permutations over the
+shingle set. The fraction of equal signature slots between two decks estimates
+the Jaccard similarity of their shingle sets. Signatures are cut into bands;
+decks sharing any band bucket are candidate near-duplicates.
+"""
+import hashlib
+import re
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+# Prime just above 2**32, so (a * x + b) % PRIME permutes 32-bit hashes.
+# a, b < 2**31 keep a * x below 2**63 and the arithmetic exact in uint64.
+PRIME = np.uint64(4294967311)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+SEED = 1
+
+# Multiplier for combining token hashes into a shingle hash (mod 2**32)
+SHINGLE_BASE = np.uint64(1000003)
+
+# Shingles processed per block, bounding the (num_perm x block) work array
+BLOCK_SIZE = 4096
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+@lru_cache(maxsize=None)
+def _permutations(num_perm):
+    rng = np.random.default_rng(SEED)
+    a = rng.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+    return a[:, None], b[:, None]
+
+
+def shingle_hashes(text, shingle_size):
+    """
+    Return the unique 32-bit hashes of the word k-shingles in `text`.
+
+    Tokens are hashed once each; shingle hashes are then combined with a
+    vectorized polynomial over a sliding window of token hashes.
+    """
+    tokens = TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+
+    cache = {}
+    token_hashes = np.fromiter(
+        (cache.setdefault(token, zlib.crc32(token.encode())) for token in tokens),
+        dtype=np.uint64,
+        count=len(tokens),
+    )
+    if len(tokens) < shingle_size:
+        shingle_size = len(tokens)
+
+    windows = np.lib.stride_tricks.sliding_window_view(token_hashes, shingle_size)
+    powers = SHINGLE_BASE ** np.arange(shingle_size, dtype=np.uint64)
+    combined = (windows * powers).sum(axis=1) & MAX_HASH
+    return np.unique(combined)
+
+
+def compute_signature(text, num_perm, shingle_size):
+    """
+    Compute the MinHash signature of `text`.
+
+    Returns:
+        np.ndarray | None: uint32 array of length num_perm, or None if the
+        text has no tokens.
+    """
+    hashes = shingle_hashes(text, shingle_size)
+    if hashes.size == 0:
+        return None
+
+    a, b = _permutations(num_perm)
+    signature = np.full(num_perm, MAX_HASH, dtype=np.uint64)
+    for start in range(0, hashes.size, BLOCK_SIZE):
+        block = hashes[start:start + BLOCK_SIZE][None, :]
+        permuted = ((a * block + b) % PRIME) & MAX_HASH
+        np.minimum(signature, permuted.min(axis=1), out=signature)
+    return signature.astype(np.uint32)
+
+
+def band_buckets(signature, bands):
+    """
+    Hash each band of the signature to a signed 64-bit bucket id.
+
+    Returns:
+        list[int]: One bucket per band, in band order.
+    """
+    if len(signature) % bands:
+        raise ValueError(f"{len(signature)} permutations cannot be split into {bands} bands")
+    return [
+        int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), 'big', signed=True)
+        for band in np.split(signature, bands)
+    ]
+
+
+def estimate_jaccard(signature, others):
+    """
+    Estimate Jaccard similarity of `signature` against each row of `others`.
+
+    Returns:
+        np.ndarray: Float array with one similarity per row.
+    """
+    return (others == signature).mean(axis=1)
+
+
+def to_bytes(signature):
+    return signature.astype('<u4').tobytes()
+
+
+def from_bytes(data):
+    return np.frombuffer(bytes(data), dtype='<u4')
@@ -24,6 +24,8 @@ class Deal(models.Model):
     
     # File
     pitch_deck = models.FileField(upload_to='pitch_decks/', null=True, blank=True)
+    # Computed on first preview; clear it wherever pitch_deck is reassigned
+    pitch_deck_sha256 = models.CharField(max_length=64, blank=True, editable=False)
     
     # Extracted company information
     company_name = models.CharField(max_length=255, blank=True)
@@ -41,6 +43,17 @@ class Deal(models.Model):
     error_message = models.TextField(blank=True)
     retry_count = models.IntegerField(default=0)
     
+    # Near-duplicate detection (MinHash of the sanitized deck text)
+    minhash_signature = models.BinaryField(null=True, blank=True, editable=False)
+    near_duplicate_of = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='near_duplicates',
+        help_text="Earlier deal whose deck this one closely matches"
+    )
+    
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -52,6 +65,43 @@ class Deal(models.Model):
         return f"{self.company_name or 'Unknown'} ({self.status})"
 
 
+class MinHashBucket(models.Model):
+    """
+    LSH band index entry: one row per (deal, band) of its MinHash signature.
+    
+    Deals sharing a (band, bucket) pair are near-duplicate candidates.
+    """
+    deal = models.ForeignKey(Deal, on_delete=models.CASCADE, related_name='minhash_buckets')
+    band = models.SmallIntegerField()
+    bucket = models.BigIntegerField()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['band', 'bucket']),
+        ]
+    
+    def __str__(self):
+        return f"Band {self.band} bucket {self.bucket} ({self.deal_id})"
+
+
+class DealEmbedding(models.Model):
+    """
+    Embedding of a deal's technology description for comparable-deal search.
+    
+    Source of truth for the on-disk vector index, which can be rebuilt from
+    this table with `manage.py rebuild_embedding_index`.
+    """
+    deal = models.OneToOneField(Deal, on_delete=models.CASCADE, related_name='embedding')
+    model_name = models.CharField(max_length=100)
+    dimensions = models.IntegerField()
+    vector = models.BinaryField()  # float32 little-endian
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Embedding for {self.deal_id} ({self.model_name})"
+
+
 class Founder(models.Model):
     """
     Represents a founder extracted from a pitch deck.
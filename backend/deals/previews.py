@@ -0,0 +1,218 @@
+"""
+Lazy page-preview rendering for pitch decks.
+
+Pages are rasterized with pdfium on first request and stored as WebP in a
+size-bounded on-disk LRU cache keyed by (content hash, page, width), so
+re-uploads of an identical deck share previews and nothing is rendered twice.
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+import uuid
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+WEBP_QUALITY = 80
+
+# pdfium is not thread-safe; serialize renders within a process
+_render_lock = threading.Lock()
+
+
+class PreviewCache:
+    """
+    On-disk LRU cache of rendered pages.
+
+    Recency is tracked with file mtimes (bumped on every hit). Writes keep a
+    running size total, seeded by one scan of the cache directory; only once
+    it exceeds `max_bytes` is the tree scanned again and least recently used
+    files evicted down to `low_watermark` of the limit. Other processes'
+    writes are picked up at that rescan.
+    """
+    low_watermark = 0.9
+
+    def __init__(self, path, max_bytes):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._total = None
+        self._lock = threading.Lock()
+
+    def key_path(self, content_hash, page, width):
+        return self.path / content_hash[:2] / f'{content_hash}-{page}-{width}.webp'
+
+    def get(self, content_hash, page, width):
+        path = self.key_path(content_hash, page, width)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another process between read and touch
+            pass
+        return data
+
+    def put(self, content_hash, page, width, data):
+        path = self.key_path(content_hash, page, width)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f'.{uuid.uuid4().hex}.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._scan())
+            else:
+                self._total += len(data)
+            if self._total > self.max_bytes:
+                self._total = self._evict(int(self.max_bytes * self.low_watermark))
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        with self._lock:
+            self._total = self._evict(self.max_bytes)
+
+    def _scan(self):
+        """Return (mtime, size, path) for every cached file"""
+        entries = []
+        for directory in os.scandir(self.path):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.name.endswith('.webp'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self, target):
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        if total <= target:
+            return total
+        entries.sort()
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+
+@lru_cache(maxsize=None)
+def _load_preview_cache(path, max_bytes):
+    return PreviewCache(path, max_bytes)
+
+
+def get_preview_cache():
+    """Return this process's cache, so its running size total persists"""
+    return _load_preview_cache(str(settings.PREVIEW_CACHE_DIR), settings.PREVIEW_CACHE_MAX_BYTES)
+
+
+def ensure_content_hash(deal):
+    """Return the SHA-256 of the deal's pitch deck, computing and storing it once"""
+    if not deal.pitch_deck_sha256:
+        digest = hashlib.sha256()
+        with deal.pitch_deck.open('rb') as f:
+            for chunk in f.chunks():
+                digest.update(chunk)
+        deal.pitch_deck_sha256 = digest.hexdigest()
+        deal.save(update_fields=['pitch_deck_sha256'])
+    return deal.pitch_deck_sha256
+
+
+def _open_pdf(data):
+    import pypdfium2 as pdfium
+
+    try:
+        return pdfium.PdfDocument(data)
+    except pdfium.PdfiumError as e:
+        raise ValueError(f"Pitch deck is not a readable PDF: {e}") from e
+
+
+def _render_image(pdf, page, width):
+    """Rasterize one page (1-indexed) of an open document; hold _render_lock"""
+    if not 1 <= page <= len(pdf):
+        raise IndexError(f"Page {page} out of range (1-{len(pdf)})")
+    pdf_page = pdf[page - 1]
+    bitmap = pdf_page.render(scale=width / pdf_page.get_width())
+    return bitmap.to_pil()
+
+
+def _encode_webp(image):
+    output = io.BytesIO()
+    image.save(output, 'WEBP', quality=WEBP_QUALITY)
+    return output.getvalue()
+
+
+def render_page(data, page, width):
+    """
+    Render one page (1-indexed) of a PDF to WebP at the given pixel width.
+
+    Raises:
+        IndexError: If the page does not exist.
+        ValueError: If the data is not a readable PDF.
+    """
+    with _render_lock:
+        pdf = _open_pdf(data)
+        try:
+            image = _render_image(pdf, page, width)
+        finally:
+            pdf.close()
+    return _encode_webp(image)
+
+
+def get_page_preview(deal, page, width):
+    """
+    Return the WebP preview of a deck page, rendering it on a cache miss.
+
+    Returns:
+        tuple[bytes, str]: Image data and the content hash (used as ETag).
+
+    Raises:
+        IndexError: If the page does not exist.
+        ValueError: If the deck is not a readable PDF.
+    """
+    content_hash = ensure_content_hash(deal)
+    cache = get_preview_cache()
+    data = cache.get(content_hash, page, width)
+    if data is None:
+        with deal.pitch_deck.open('rb') as f:
+            data = render_page(f.read(), page, width)
+        cache.put(content_hash, page, width, data)
+    return data, content_hash
+
+
+def prewarm_previews(deal, pages, width):
+    """Render the first `pages` pages into the cache; returns pages rendered"""
+    content_hash = ensure_content_hash(deal)
+    cache = get_preview_cache()
+    with deal.pitch_deck.open('rb') as f:
+        data = f.read()
+
+    # Parse the document once and rasterize every missing page from it
+    images = {}
+    with _render_lock:
+        pdf = _open_pdf(data)
+        try:
+            for page in range(1, min(pages, len(pdf)) + 1):
+                if cache.get(content_hash, page, width) is None:
+                    images[page] = _render_image(pdf, page, width)
+        finally:
+            pdf.close()
+
+    for page, image in images.items():
+        cache.put(content_hash, page, width, _encode_webp(image))
+    logger.info(f"Pre-warmed {len(images)} preview pages for deal {deal.id}")
+    return len(images)
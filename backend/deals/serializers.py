@@ -60,9 +60,18 @@ class DealDetailSerializer(serializers.ModelSerializer):
             'updated_at',
             'processed_at',
             'error_message',
+            'near_duplicate_of',
         ]
 
 
+class SimilarDealSerializer(DealListSerializer):
+    """List serializer plus the similarity score of a match"""
+    similarity = serializers.FloatField(read_only=True)
+    
+    class Meta(DealListSerializer.Meta):
+        fields = DealListSerializer.Meta.fields + ['similarity']
+
+
 class DealCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new deals"""
     class Meta:
@@ -17,40 +17,269 @@ You have complete creative freedom in your approach:
 The core.utils module provides helper functions:
 - sanitize_text(text): Clean extracted text
 - log_task_execution: Decorator for logging (use on your task function)
+
+Use get_openai_client() to obtain the OpenAI client.
 """
 
 import logging
-from openai import OpenAI
+import os
+import threading
 from django.conf import settings
 from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
+from core.utils import sanitize_text
+from .models import Deal, DealEmbedding, MinHashBucket
+
 logger = logging.getLogger(__name__)
 
-# Configure OpenAI client
-# Note: Using custom httpx client to avoid proxy-related initialization errors
-try:
+# OpenAI client
+# The client (and its httpx connection pool) is created lazily on first use and
+# per process: web workers and management commands never import openai/httpx
+# unless they actually call the API, and prefork Celery children build their
+# own pool instead of reusing sockets inherited from the parent.
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_openai_client():
+    """
+    Return the OpenAI client for the current process, creating it on first use.
+
+    Returns:
+        OpenAI | None: Configured client, or None if OPENAI_API_KEY is not set
+        or initialization failed.
+    """
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client_pid == pid:
+        return _client
+
+    with _client_lock:
+        if _client_pid != pid:
+            # Forked since the client was built: drop the inherited reference
+            # without closing it, the sockets belong to the parent process.
+            _client = _build_openai_client()
+            _client_pid = pid
+    return _client
+
+
+def _build_openai_client():
     api_key = settings.OPENAI_API_KEY
     if not api_key:
         logger.warning("OPENAI_API_KEY not set - OpenAI features will be disabled")
-        client = None
-    else:
+        return None
+
+    try:
         import httpx
-        
+        from openai import OpenAI
+
         # Create httpx client without proxy to avoid initialization issues
         http_client = httpx.Client(
-            timeout=60.0,
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
+            timeout=settings.OPENAI_TIMEOUT,
+            limits=httpx.Limits(
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            )
         )
-        
+
         client = OpenAI(
             api_key=api_key,
             http_client=http_client
         )
         logger.info("OpenAI client initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize OpenAI client: {e}")
-    client = None
+        return client
+    except Exception as e:
+        logger.error(f"Failed to initialize OpenAI client: {e}")
+        return None
+
+
+def index_deck_signature(deal, text):
+    """
+    Store the MinHash signature of a deck and link it to a prior near-duplicate.
+    
+    Call this from the processing pipeline once text has been extracted; the
+    returned deal's analysis can then be reused or diffed instead of starting
+    from scratch.
+    
+    Args:
+        deal: Deal the text was extracted from
+        text: Raw extracted deck text (sanitized here)
+        
+    Returns:
+        Deal | None: Most similar earlier deal at or above
+        NEAR_DUPLICATE_THRESHOLD, or None.
+    """
+    from . import minhash
+    
+    signature = minhash.compute_signature(
+        sanitize_text(text),
+        settings.MINHASH_NUM_PERM,
+        settings.MINHASH_SHINGLE_SIZE,
+    )
+    
+    prior = None
+    with transaction.atomic():
+        MinHashBucket.objects.filter(deal=deal).delete()
+        
+        if signature is not None:
+            buckets = minhash.band_buckets(signature, settings.MINHASH_BANDS)
+            earlier = [
+                match for match in _similar_by_signature(
+                    signature, buckets, settings.NEAR_DUPLICATE_THRESHOLD, exclude_id=deal.id
+                )
+                if match.created_at < deal.created_at
+            ]
+            prior = earlier[0] if earlier else None
+            MinHashBucket.objects.bulk_create([
+                MinHashBucket(deal=deal, band=band, bucket=bucket)
+                for band, bucket in enumerate(buckets)
+            ])
+        
+        deal.minhash_signature = minhash.to_bytes(signature) if signature is not None else None
+        deal.near_duplicate_of = prior
+        deal.save(update_fields=['minhash_signature', 'near_duplicate_of', 'updated_at'])
+    
+    if prior:
+        logger.info(f"Deal {deal.id} is a near-duplicate of {prior.id} (similarity {prior.similarity:.2f})")
+    return prior
+
+
+def find_similar_deals(deal, threshold=None, limit=10):
+    """
+    Find deals whose decks are near-duplicates of this deal's deck.
+    
+    Args:
+        deal: Deal with a stored MinHash signature
+        threshold: Minimum estimated Jaccard similarity (defaults to
+            NEAR_DUPLICATE_THRESHOLD)
+        limit: Maximum number of deals to return
+        
+    Returns:
+        list[Deal]: Most similar first, each with a `similarity` attribute.
+    """
+    from . import minhash
+    
+    if not deal.minhash_signature:
+        return []
+    if threshold is None:
+        threshold = settings.NEAR_DUPLICATE_THRESHOLD
+    
+    signature = minhash.from_bytes(deal.minhash_signature)
+    buckets = minhash.band_buckets(signature, settings.MINHASH_BANDS)
+    return _similar_by_signature(signature, buckets, threshold, exclude_id=deal.id)[:limit]
+
+
+def _similar_by_signature(signature, buckets, threshold, exclude_id=None):
+    """Look up LSH candidates, then rank them by estimated Jaccard similarity"""
+    import numpy as np
+    from . import minhash
+    
+    condition = Q()
+    for band, bucket in enumerate(buckets):
+        condition |= Q(band=band, bucket=bucket)
+    candidate_ids = (
+        MinHashBucket.objects
+        .filter(condition)
+        .exclude(deal_id=exclude_id)
+        .values('deal_id')
+    )
+    candidates = [
+        candidate for candidate in
+        Deal.objects
+        .filter(id__in=candidate_ids)
+        .only('id', 'company_name', 'status', 'created_at', 'processed_at', 'minhash_signature')
+        if candidate.minhash_signature
+        and len(candidate.minhash_signature) == len(signature) * 4
+    ]
+    if not candidates:
+        return []
+    
+    matrix = np.vstack([minhash.from_bytes(candidate.minhash_signature) for candidate in candidates])
+    scores = minhash.estimate_jaccard(signature, matrix)
+    
+    matches = []
+    for candidate, score in zip(candidates, scores):
+        if score >= threshold:
+            candidate.similarity = float(score)
+            matches.append(candidate)
+    matches.sort(key=lambda match: (-match.similarity, match.created_at))
+    return matches
+
+
+def embed_deal(deal):
+    """
+    Embed a deal's technology description and add it to the vector index.
+    
+    Call this from the processing pipeline once technology_description has
+    been extracted.
+    
+    Returns:
+        DealEmbedding | None: Stored embedding, or None if there is no
+        description to embed (any previous embedding is deleted).
+    """
+    from .embeddings import get_embedder, get_vector_index
+    
+    text = sanitize_text(deal.technology_description)
+    if not text:
+        # The stale index row is skipped by find_comparable_deals and dropped
+        # at the next rebuild_embedding_index
+        DealEmbedding.objects.filter(deal=deal).delete()
+        return None
+    
+    embedder = get_embedder()
+    vector = embedder.embed([text])[0].astype('<f4')
+    embedding, _ = DealEmbedding.objects.update_or_create(
+        deal=deal,
+        defaults={
+            'model_name': embedder.name,
+            'dimensions': embedder.dimensions,
+            'vector': vector.tobytes(),
+        },
+    )
+    get_vector_index().append(deal.id, vector)
+    return embedding
+
+
+def find_comparable_deals(deal, k=10):
+    """
+    Find the k deals with the most similar technology descriptions.
+    
+    Returns:
+        list[Deal]: Most similar first, each with a `similarity` attribute
+        (cosine similarity).
+    """
+    import numpy as np
+    from .embeddings import get_vector_index
+    
+    embedding = DealEmbedding.objects.filter(deal=deal).only('vector').first()
+    if embedding is None:
+        return []
+    
+    vector = np.frombuffer(bytes(embedding.vector), dtype='<f4')
+    index = get_vector_index()
+    candidates = Deal.objects.filter(embedding__isnull=False).only(
+        'id', 'company_name', 'status', 'created_at', 'processed_at'
+    )
+    
+    # Deals deleted or with their description cleared keep their index rows
+    # until the next rebuild; search wider until k live deals are found.
+    fetch = k
+    while True:
+        matches = index.search(vector, k=fetch, exclude=[deal.id])
+        deals = candidates.in_bulk([deal_id for deal_id, _ in matches])
+        results = []
+        for deal_id, score in matches:
+            if deal_id in deals:
+                match = deals[deal_id]
+                match.similarity = score
+                results.append(match)
+        if len(results) >= k or len(matches) < fetch:
+            return results[:k]
+        fetch *= 2
 
 
 # TODO: Implement your processing functions here
@@ -26,6 +26,41 @@ def process_deal_async(deal_id):
     except Exception as e:
         # Handle errors
         pass
+
+Implemented so far:
+
+- prewarm_deck_previews(deal_id, pages=None): render the first deck pages
+  into the preview cache (see deals.previews).
+
+Once process_deal_async has extracted the deck text it should also call
+services.index_deck_signature() and services.embed_deal(), and queue
+prewarm_deck_previews for the deal.
 """
 
 # TODO: Import necessary modules and implement your task function
+
+from celery import shared_task
+from django.conf import settings
+from core.utils import log_task_execution
+from .models import Deal
+from .previews import prewarm_previews
+
+
+@shared_task
+@log_task_execution
+def prewarm_deck_previews(deal_id, pages=None):
+    """
+    Render the first pages of a deck into the preview cache.
+    
+    Queue this from the processing task once the deck is stored; pages
+    defaults to PREVIEW_PREWARM_PAGES (0 disables pre-warming).
+    """
+    if pages is None:
+        pages = settings.PREVIEW_PREWARM_PAGES
+    if pages <= 0:
+        return 0
+    
+    deal = Deal.objects.get(id=deal_id)
+    if not deal.pitch_deck:
+        return 0
+    return prewarm_previews(deal, pages, settings.PREVIEW_DEFAULT_WIDTH)
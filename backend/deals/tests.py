@@ -3,9 +3,35 @@ Tests for deals app.
 
 Basic test structure provided. Candidates can expand if desired.
 """
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import brotli
+import msgpack
+import numpy as np
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 from django.core.files.uploadedfile import SimpleUploadedFile
-from .models import Deal, Founder, Assessment
+from core.http import parse_range
+from core.paginators import EstimatedCountPaginator
+from . import minhash, previews, services
+from .models import Deal, DealEmbedding, Founder, Assessment, MinHashBucket
+from .previews import PreviewCache
+from .tasks import prewarm_deck_previews
+from .vector_index import VectorIndex
 
 
 class DealModelTest(TestCase):
@@ -63,6 +89,648 @@ class AssessmentModelTest(TestCase):
         self.assertEqual(assessment.overall_score, 7.5)
 
 
+class OpenAIClientTest(TestCase):
+    """Test lazy, per-process OpenAI client creation"""
+    
+    def setUp(self):
+        services._client = None
+        services._client_pid = None
+        self.addCleanup(setattr, services, '_client_pid', None)
+        self.addCleanup(setattr, services, '_client', None)
+    
+    def test_startup_does_not_import_openai(self):
+        """Loading settings, URLs and services must not pull in openai/httpx/numpy"""
+        code = (
+            "import os, sys, django\n"
+            "os.environ['DJANGO_SETTINGS_MODULE'] = 'config.settings'\n"
+            "os.environ['OPENAI_API_KEY'] = 'sk-test'\n"
+            "django.setup()\n"
+            "import config.urls, deals.services\n"
+            "print(sorted(m for m in ('openai', 'httpx', 'numpy') if m in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), '[]')
+    
+    @override_settings(OPENAI_API_KEY='')
+    def test_client_disabled_without_key(self):
+        """Test no client is built when the API key is missing"""
+        self.assertIsNone(services.get_openai_client())
+    
+    @override_settings(OPENAI_API_KEY='sk-test', OPENAI_MAX_CONNECTIONS=3)
+    def test_client_rebuilt_after_fork(self):
+        """Test the client is cached per process and rebuilt in a new PID"""
+        with mock.patch.object(services.os, 'getpid', return_value=100):
+            first = services.get_openai_client()
+            self.assertIsNotNone(first)
+            self.assertIs(services.get_openai_client(), first)
+        with mock.patch.object(services.os, 'getpid', return_value=101):
+            second = services.get_openai_client()
+        self.assertIsNot(second, first)
+        self.assertEqual(second._client._transport._pool._max_connections, 3)
+
+
+class DealExportTest(TestCase):
+    """Test streaming deal export"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.deal = Deal.objects.create(company_name="Acme Inc", status="completed")
+        Founder.objects.create(deal=self.deal, name="Jane Doe", order=0)
+        Founder.objects.create(deal=self.deal, name="John Roe", order=1)
+        Assessment.objects.create(
+            deal=self.deal,
+            team_strength=8,
+            market_opportunity=7,
+            product_innovation=9,
+            business_model=6,
+            overall_score=7.5,
+            strengths=["Strong team"],
+        )
+        Deal.objects.create(company_name="Pending Co", status="pending")
+    
+    def _content(self, response):
+        return b''.join(response.streaming_content).decode()
+    
+    def test_export_csv(self):
+        """Test CSV export joins founders and assessment"""
+        response = self.client.get('/api/deals/export/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(self._content(response))))
+        self.assertEqual(len(rows), 2)
+        acme = next(row for row in rows if row['company_name'] == "Acme Inc")
+        self.assertEqual(acme['founders'], "Jane Doe; John Roe")
+        self.assertEqual(acme['overall_score'], "7.5")
+    
+    def test_export_csv_escapes_formulas(self):
+        """Test cells that spreadsheets would evaluate are quoted"""
+        deal = Deal.objects.create(company_name='=HYPERLINK("x") 4499', location="-1+1")
+        Founder.objects.create(deal=deal, name="@SUM(A1)")
+        response = self.client.get('/api/deals/export/')
+        rows = list(csv.DictReader(io.StringIO(self._content(response))))
+        row = next(row for row in rows if row['id'] == str(deal.id))
+        self.assertEqual(row['company_name'], '\'=HYPERLINK("x") 4499')
+        self.assertEqual(row['location'], "'-1+1")
+        self.assertEqual(row['founders'], "'@SUM(A1)")
+        acme = next(row for row in rows if row['company_name'] == "Acme Inc")
+        self.assertEqual(acme['overall_score'], "7.5")
+    
+    def test_export_ndjson_filters(self):
+        """Test NDJSON export with status and score filters"""
+        response = self.client.get(
+            '/api/deals/export/',
+            {'output': 'ndjson', 'status': 'completed,pending', 'min_score': '7'},
+        )
+        lines = self._content(response).splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual(row['id'], str(self.deal.id))
+        self.assertEqual(row['founders'], ["Jane Doe", "John Roe"])
+    
+    def test_export_accepts_its_media_types(self):
+        """Test Accept headers naming the export formats are not rejected"""
+        response = self.client.get('/api/deals/export/', HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        
+        response = self.client.get(
+            '/api/deals/export/', {'output': 'ndjson'}, HTTP_ACCEPT='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self._content(response).splitlines()), 2)
+        
+        response = self.client.get('/api/deals/export/', {'output': 'xml'}, HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_export_rejects_bad_filters(self):
+        """Test malformed export parameters return 400"""
+        for params in (
+            {'output': 'xml'},
+            {'status': 'bogus'},
+            {'created_after': 'yesterday'},
+            {'min_score': 'nan'},
+            {'max_score': 'inf'},
+        ):
+            response = self.client.get('/api/deals/export/', params)
+            self.assertEqual(response.status_code, 400)
+    
+    def test_export_query_count_is_constant(self):
+        """Test founders are prefetched per chunk, not per deal"""
+        for i in range(5):
+            deal = Deal.objects.create(company_name=f"Co {i}")
+            Founder.objects.create(deal=deal, name=f"Founder {i}")
+        with self.assertNumQueries(2):
+            self._content(self.client.get('/api/deals/export/'))
+
+
+class AdminChangelistQueryTest(TestCase):
+    """Test admin changelists run a constant number of queries"""
+    
+    def setUp(self):
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(user)
+    
+    def _add_deals(self, count):
+        for i in range(count):
+            deal = Deal.objects.create(company_name=f"Co {i}", status="completed")
+            Founder.objects.create(deal=deal, name=f"Founder {i}")
+            Assessment.objects.create(
+                deal=deal,
+                team_strength=5,
+                market_opportunity=5,
+                product_innovation=5,
+                business_model=5,
+                overall_score=5.0,
+            )
+    
+    def _query_count(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        sql = [query['sql'].upper() for query in queries.captured_queries]
+        # One paginator count, no full-table recount, no DISTINCT scans for filters
+        self.assertEqual(sum('COUNT(' in q for q in sql), 1)
+        self.assertFalse(any('DISTINCT' in q for q in sql))
+        return len(queries)
+    
+    def test_changelist_query_count_is_constant(self):
+        """Test query count does not grow with the number of rows"""
+        urls = [
+            '/admin/deals/deal/',
+            '/admin/deals/deal/?created_at__gte=2000-01-01T00:00:00Z',
+            '/admin/deals/founder/',
+            '/admin/deals/assessment/',
+            '/admin/deals/assessment/?team_strength=5',
+        ]
+        self._add_deals(2)
+        small = [self._query_count(url) for url in urls]
+        self._add_deals(10)
+        large = [self._query_count(url) for url in urls]
+        self.assertEqual(small, large)
+    
+    def test_score_filter_ignores_invalid_values(self):
+        """Test a non-numeric score filter value doesn't error"""
+        self._add_deals(2)
+        response = self.client.get('/admin/deals/assessment/?team_strength=abc')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 2)
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    """Test the planner-estimate count used by admin changelists"""
+    
+    def setUp(self):
+        for i in range(3):
+            Deal.objects.create(company_name=f"Co {i}", status="pending" if i else "completed")
+    
+    def _paginator(self, queryset, reltuples):
+        """Build a paginator whose database reports Postgres with `reltuples` rows"""
+        fake = mock.MagicMock(vendor='postgresql')
+        cursor = fake.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (reltuples,)
+        patcher = mock.patch('core.paginators.connections', {queryset.db: fake})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return EstimatedCountPaginator(queryset, 20), cursor
+    
+    def test_uses_reltuples_above_threshold(self):
+        """Test an unfiltered queryset on a large table uses the estimate"""
+        paginator, cursor = self._paginator(Deal.objects.all(), 50000)
+        self.assertEqual(paginator.count, 50000)
+        sql, params = cursor.execute.call_args.args
+        self.assertIn('reltuples', sql)
+        self.assertEqual(params, [Deal._meta.db_table])
+    
+    def test_exact_count_below_threshold(self):
+        """Test small or never-analyzed tables fall back to COUNT(*)"""
+        for reltuples in (EstimatedCountPaginator.estimate_threshold, -1):
+            paginator, cursor = self._paginator(Deal.objects.all(), reltuples)
+            self.assertEqual(paginator.count, 3)
+            cursor.execute.assert_called_once()
+    
+    def test_exact_count_when_filtered(self):
+        """Test filtered querysets never use the table estimate"""
+        paginator, cursor = self._paginator(Deal.objects.filter(status="pending"), 50000)
+        self.assertEqual(paginator.count, 2)
+        cursor.execute.assert_not_called()
+    
+    def test_exact_count_on_other_backends(self):
+        """Test non-Postgres databases use COUNT(*)"""
+        paginator = EstimatedCountPaginator(Deal.objects.all(), 20)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(paginator.count, 3)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('COUNT(', queries[0]['sql'].upper())
+
+
+class RenderingAndCompressionTest(TestCase):
+    """Test orjson/MessagePack rendering and response compression"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.deal = Deal.objects.create(company_name="Acme Inc \u2028", status="completed")
+        Assessment.objects.create(
+            deal=self.deal,
+            team_strength=8,
+            market_opportunity=7,
+            product_innovation=9,
+            business_model=6,
+            overall_score=7.5,
+            investment_thesis="Large market. " * 200,
+        )
+        self.url = f'/api/deals/{self.deal.id}/'
+    
+    def test_orjson_matches_json_renderer(self):
+        """Test default renderer output is identical to DRF's JSONRenderer"""
+        from rest_framework.renderers import JSONRenderer
+        from core.renderers import ORJSONRenderer
+        data = {
+            'id': self.deal.id,
+            'name': "Acme \u2028",
+            'scores': [1, 2.5, None],
+            'created_at': self.deal.created_at,
+            'processed_at': self.deal.created_at.replace(microsecond=0),
+            'date': self.deal.created_at.date(),
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        
+        # Documented float differences: same value, different spelling
+        self.assertEqual(json.loads(ORJSONRenderer().render([1e16])), [1e16])
+        self.assertEqual(ORJSONRenderer().render([float('nan')]), b'[null]')
+    
+    def test_msgpack_by_accept_header(self):
+        """Test MessagePack is returned only when requested"""
+        response = self.client.get(self.url, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        data = msgpack.unpackb(response.content)
+        self.assertEqual(data['assessment']['overall_score'], 7.5)
+        
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/json')
+    
+    def test_compression_above_threshold(self):
+        """Test brotli is preferred, gzip is the fallback"""
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(json.loads(brotli.decompress(response.content))['id'], str(self.deal.id))
+        
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.content))['id'], str(self.deal.id))
+    
+    @override_settings(COMPRESSION_MIN_SIZE=1024 * 1024)
+    def test_no_compression_below_threshold(self):
+        """Test small responses are sent uncompressed"""
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+    
+    def test_streaming_export_compressed(self):
+        """Test streamed exports are compressed incrementally"""
+        response = self.client.get(
+            '/api/deals/export/', {'output': 'ndjson'}, HTTP_ACCEPT_ENCODING='br'
+        )
+        self.assertEqual(response['Content-Encoding'], 'br')
+        content = brotli.decompress(b''.join(response.streaming_content)).decode()
+        self.assertIn("Acme Inc", content)
+    
+    def test_text_responses_use_gzip(self):
+        """Test text/* responses are never brotli-compressed"""
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(user)
+        response = self.client.get('/admin/deals/deal/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        
+        response = self.client.get('/admin/deals/deal/', HTTP_ACCEPT_ENCODING='br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        
+        response = self.client.get('/api/deals/export/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        content = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assertIn("Acme Inc", content)
+
+
+DECK_TEXT = " ".join(
+    f"slide {i} our platform helps mid market lenders automate underwriting "
+    f"with proprietary data and reduces loss rates by {i} percent"
+    for i in range(40)
+)
+
+
+class NearDuplicateTest(TestCase):
+    """Test MinHash/LSH near-duplicate deck detection"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.original = Deal.objects.create(company_name="Lendly")
+        services.index_deck_signature(self.original, DECK_TEXT)
+    
+    def test_signature_estimates_jaccard(self):
+        """Test edited decks score high and unrelated decks score low"""
+        sig = minhash.compute_signature(DECK_TEXT, 128, 5)
+        edited = minhash.compute_signature(DECK_TEXT.replace("slide 3 ", "slide three "), 128, 5)
+        other = minhash.compute_signature("a completely different robotics deck " * 20, 128, 5)
+        self.assertGreater(minhash.estimate_jaccard(sig, edited[None, :])[0], 0.8)
+        self.assertLess(minhash.estimate_jaccard(sig, other[None, :])[0], 0.2)
+        self.assertIsNone(minhash.compute_signature("", 128, 5))
+    
+    def test_resubmission_linked_to_prior_deal(self):
+        """Test a v2 deck is linked to the earlier deal"""
+        v2 = Deal.objects.create(company_name="Lendly v2")
+        prior = services.index_deck_signature(v2, DECK_TEXT + " new traction slide")
+        self.assertEqual(prior, self.original)
+        v2.refresh_from_db()
+        self.assertEqual(v2.near_duplicate_of, self.original)
+        self.assertEqual(MinHashBucket.objects.filter(deal=v2).count(), 32)
+        
+        unrelated = Deal.objects.create(company_name="Robo")
+        self.assertIsNone(services.index_deck_signature(unrelated, "warehouse robots " * 50))
+    
+    def test_near_duplicates_endpoint(self):
+        """Test the API lists near-duplicates with their similarity"""
+        v2 = Deal.objects.create(company_name="Lendly v2")
+        services.index_deck_signature(v2, DECK_TEXT + " new traction slide")
+        
+        response = self.client.get(f'/api/deals/{self.original.id}/near-duplicates/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.json()], [str(v2.id)])
+        self.assertGreater(response.json()[0]['similarity'], 0.8)
+        
+        url = f'/api/deals/{self.original.id}/near-duplicates/'
+        self.assertEqual(self.client.get(url, {'threshold': '0.6'}).status_code, 200)
+        for threshold in ('2', '0.3', 'nan'):
+            response = self.client.get(url, {'threshold': threshold})
+            self.assertEqual(response.status_code, 400)
+
+
+class ComparableDealsTest(TestCase):
+    """Test embeddings and the comparable-deals vector index"""
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.index_dir = tmp.name
+        override = override_settings(
+            DEAL_EMBEDDER='deals.embeddings.HashingEmbedder',
+            EMBEDDING_INDEX_DIR=self.index_dir,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        
+        self.client = APIClient()
+        self.deals = {}
+        for name, description in [
+            ("Lendly", "AI underwriting platform for small business lending and credit risk"),
+            ("Credo", "Credit risk models and underwriting automation for lending teams"),
+            ("Robo", "Autonomous warehouse robots for picking and packing"),
+        ]:
+            deal = Deal.objects.create(company_name=name, technology_description=description)
+            services.embed_deal(deal)
+            self.deals[name] = deal
+    
+    def test_similar_endpoint_ranks_by_cosine(self):
+        """Test the closest description ranks first and the deal itself is excluded"""
+        response = self.client.get(f'/api/deals/{self.deals["Lendly"].id}/similar/', {'k': 2})
+        self.assertEqual(response.status_code, 200)
+        names = [row['company_name'] for row in response.json()]
+        self.assertEqual(names, ["Credo", "Robo"])
+        self.assertGreater(response.json()[0]['similarity'], response.json()[1]['similarity'])
+        
+        response = self.client.get(f'/api/deals/{self.deals["Lendly"].id}/similar/', {'k': 'all'})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_stale_index_rows_do_not_take_result_slots(self):
+        """Test deleted deals and cleared descriptions are skipped, still returning k"""
+        for name in ("Ledger", "Vault"):
+            deal = Deal.objects.create(company_name=name, technology_description=f"{name} lending software")
+            services.embed_deal(deal)
+        self.deals["Credo"].delete()
+        robo = self.deals["Robo"]
+        robo.technology_description = ""
+        self.assertIsNone(services.embed_deal(robo))
+        self.assertFalse(DealEmbedding.objects.filter(deal=robo).exists())
+        
+        response = self.client.get(f'/api/deals/{self.deals["Lendly"].id}/similar/', {'k': 2})
+        self.assertEqual(sorted(row['company_name'] for row in response.json()), ["Ledger", "Vault"])
+        
+        response = self.client.get(f'/api/deals/{self.deals["Lendly"].id}/similar/', {'k': 10})
+        self.assertEqual(len(response.json()), 2)
+    
+    def test_index_sees_appends_from_other_processes(self):
+        """Test rows appended through another index instance are picked up"""
+        index = VectorIndex(self.index_dir, 256)
+        self.assertEqual(len(index), 3)
+        
+        other = VectorIndex(self.index_dir, 256)
+        vector = np.zeros(256, dtype=np.float32)
+        vector[0] = 1
+        other.append(self.deals["Robo"].id, vector)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.search(vector, k=1), [(self.deals["Robo"].id, 1.0)])
+    
+    def test_rebuild_seen_by_open_index(self):
+        """Test an open index remaps ids after another instance rebuilds"""
+        index = VectorIndex(self.index_dir, 256)
+        basis = np.eye(256, dtype=np.float32)
+        ids = [deal.id for deal in self.deals.values()]
+        index.rebuild(zip(ids, basis[:3]))
+        self.assertEqual(index.search(basis[0], k=1)[0][0], ids[0])
+        
+        # Same row count, different id order: ids must not stay attached to
+        # the old rows
+        VectorIndex(self.index_dir, 256).rebuild(zip(reversed(ids), basis[:3]))
+        self.assertEqual(index.search(basis[0], k=1)[0][0], ids[2])
+        self.assertEqual(index.search(basis[2], k=1)[0][0], ids[0])
+        self.assertEqual(sorted(os.listdir(self.index_dir)), ['ids.bin', 'lock', 'meta.json', 'vectors.f32'])
+        
+        # A refresh that saw only the vectors file swapped must still pick up
+        # the ids file once it changes
+        staging = VectorIndex(Path(self.index_dir) / 'staging', 256)
+        staging.rebuild(zip(ids, basis[:3]))
+        os.replace(staging.vectors_path, index.vectors_path)
+        index.refresh()
+        os.replace(staging.ids_path, index.ids_path)
+        self.assertEqual(index.search(basis[0], k=1)[0][0], ids[0])
+    
+    def test_rebuild_from_table(self):
+        """Test the index can be rebuilt from stored embeddings"""
+        DealEmbedding.objects.filter(deal=self.deals["Robo"]).delete()
+        call_command('rebuild_embedding_index', stdout=io.StringIO())
+        self.assertEqual(len(VectorIndex(self.index_dir, 256)), 2)
+
+
+def make_pdf(pages=3):
+    """Build a small multi-page PDF"""
+    images = [Image.new('RGB', (800, 600), (i * 60, 120, 200)) for i in range(pages)]
+    output = io.BytesIO()
+    images[0].save(output, 'PDF', save_all=True, append_images=images[1:])
+    return output.getvalue()
+
+
+class DeckPreviewTest(TestCase):
+    """Test page previews, the preview cache and ranged deck downloads"""
+    
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = Path(tmp.name) / 'previews'
+        override = override_settings(MEDIA_ROOT=tmp.name, PREVIEW_CACHE_DIR=self.cache_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+        
+        self.client = APIClient()
+        self.pdf = make_pdf()
+        self.deal = Deal.objects.create(
+            company_name="Acme Inc",
+            pitch_deck=SimpleUploadedFile("deck.pdf", self.pdf, content_type="application/pdf"),
+        )
+        self.url = f'/api/deals/{self.deal.id}/'
+    
+    def test_preview_rendered_once_and_cached(self):
+        """Test a page is rendered on first request and served from cache after"""
+        response = self.client.get(self.url + 'pages/2/preview/', {'width': 320})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertEqual(Image.open(io.BytesIO(response.content)).size, (320, 240))
+        
+        with mock.patch('deals.previews.render_page') as render:
+            response = self.client.get(self.url + 'pages/2/preview/', {'width': 320})
+            self.assertEqual(response.status_code, 200)
+            render.assert_not_called()
+            
+            response = self.client.get(
+                self.url + 'pages/2/preview/', {'width': 320}, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+            self.assertEqual(response.status_code, 304)
+    
+    def test_accept_headers_for_raw_media(self):
+        """Test image/webp and application/pdf Accept headers are not rejected"""
+        response = self.client.get(self.url + 'pages/1/preview/', HTTP_ACCEPT='image/webp')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        
+        response = self.client.get(self.url + 'deck/', HTTP_ACCEPT='application/pdf')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.pdf)
+    
+    def test_preview_bad_requests(self):
+        """Test missing pages 404 and unsupported widths 400"""
+        self.assertEqual(self.client.get(self.url + 'pages/4/preview/').status_code, 404)
+        self.assertEqual(self.client.get(self.url + 'pages/0/preview/').status_code, 404)
+        response = self.client.get(self.url + 'pages/1/preview/', {'width': 999})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_replacing_deck_resets_content_hash(self):
+        """Test a deck replaced in the admin gets a new hash, previews and ETag"""
+        first = self.client.get(self.url + 'pages/1/preview/')
+        self.assertTrue(Deal.objects.get(id=self.deal.id).pitch_deck_sha256)
+        
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(user)
+        change_url = f'/admin/deals/deal/{self.deal.id}/change/'
+        form = {
+            'status': 'completed',
+            'company_name': "Renamed",
+            'website': '',
+            'location': '',
+            'technology_description': '',
+            'funding_ask': '',
+            'error_message': '',
+            'retry_count': 0,
+        }
+        response = self.client.post(change_url, form)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Deal.objects.get(id=self.deal.id).pitch_deck_sha256)
+        
+        deck = SimpleUploadedFile("deck-v2.pdf", make_pdf(pages=1), content_type="application/pdf")
+        response = self.client.post(change_url, {**form, 'pitch_deck': deck})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Deal.objects.get(id=self.deal.id).pitch_deck_sha256, '')
+        
+        second = self.client.get(self.url + 'pages/1/preview/')
+        self.assertNotEqual(first['ETag'], second['ETag'])
+        self.assertEqual(self.client.get(self.url + 'pages/2/preview/').status_code, 404)
+    
+    def test_preview_of_corrupt_deck(self):
+        """Test an unreadable upload returns 422 rather than 500"""
+        deal = Deal.objects.create(
+            company_name="Broken",
+            pitch_deck=SimpleUploadedFile("broken.pdf", b"not a pdf", content_type="application/pdf"),
+        )
+        response = self.client.get(f'/api/deals/{deal.id}/pages/1/preview/')
+        self.assertEqual(response.status_code, 422)
+    
+    def test_cache_evicts_least_recently_used(self):
+        """Test the cache stays under its size bound, evicting the oldest entry"""
+        cache = PreviewCache(self.cache_dir, max_bytes=250)
+        cache.put('a' * 64, 1, 320, b'x' * 100)
+        cache.put('b' * 64, 1, 320, b'x' * 100)
+        old = cache.key_path('a' * 64, 1, 320)
+        os.utime(old, (0, 0))
+        cache.put('c' * 64, 1, 320, b'x' * 100)
+        self.assertFalse(old.exists())
+        self.assertIsNotNone(cache.get('b' * 64, 1, 320))
+        self.assertIsNotNone(cache.get('c' * 64, 1, 320))
+    
+    def test_cache_scans_only_when_over_limit(self):
+        """Test writes under the limit don't rescan the cache tree"""
+        cache = PreviewCache(self.cache_dir, max_bytes=1000)
+        with mock.patch.object(cache, '_scan', wraps=cache._scan) as scan:
+            for page in range(1, 10):
+                cache.put('a' * 64, page, 320, b'x' * 100)
+            self.assertEqual(scan.call_count, 1)
+            cache.put('a' * 64, 10, 320, b'x' * 200)
+            self.assertEqual(scan.call_count, 2)
+        self.assertLessEqual(cache._total, 900)
+        self.assertEqual(cache._total, sum(size for _, size, _ in cache._scan()))
+    
+    def test_prewarm_task(self):
+        """Test pre-warming renders the first pages only once"""
+        with mock.patch('deals.previews._open_pdf', wraps=previews._open_pdf) as open_pdf:
+            self.assertEqual(prewarm_deck_previews(self.deal.id, pages=2), 2)
+        open_pdf.assert_called_once()
+        self.assertEqual(prewarm_deck_previews(self.deal.id, pages=5), 1)
+        self.assertEqual(prewarm_deck_previews(self.deal.id, pages=0), 0)
+    
+    def test_parse_range_edge_cases(self):
+        """Test suffix ranges and empty files"""
+        self.assertEqual(parse_range('bytes=-5', 100), (95, 99))
+        self.assertEqual(parse_range('bytes=-500', 100), (0, 99))
+        self.assertIs(parse_range('bytes=-0', 100), False)
+        self.assertIs(parse_range('bytes=-5', 0), False)
+        self.assertIs(parse_range('bytes=0-', 0), False)
+        self.assertIsNone(parse_range('bytes=0-1,4-5', 100))
+    
+    def test_deck_range_requests(self):
+        """Test the original PDF is served whole or by byte range"""
+        response = self.client.get(self.url + 'deck/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(b''.join(response.streaming_content), self.pdf)
+        
+        response = self.client.get(self.url + 'deck/', HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.pdf)}')
+        self.assertEqual(b''.join(response.streaming_content), self.pdf[10:20])
+        
+        response = self.client.get(self.url + 'deck/', HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), self.pdf[-5:])
+        
+        response = self.client.get(self.url + 'deck/', HTTP_RANGE=f'bytes={len(self.pdf)}-')
+        self.assertEqual(response.status_code, 416)
+        
+        response = self.client.get(self.url + 'deck/', HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.pdf)
+
+
 # TODO: Candidates can add more tests
 # - Test API endpoints
 # - Test service functions
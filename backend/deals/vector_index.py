@@ -0,0 +1,218 @@
+"""
+Memory-mapped NumPy vector index for top-K cosine similarity search.
+
+Vectors are L2-normalized float32 rows appended to ``vectors.f32`` with the
+matching 16-byte deal UUIDs in ``ids.bin``. Readers memory-map the files and
+pick up rows appended by other processes (e.g. the Celery worker) on the next
+query; re-embedding a deal appends a new row that supersedes the old one.
+"""
+import fcntl
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+ID_SIZE = 16
+
+
+class VectorIndex:
+    """
+    Append-only cosine similarity index over deal embeddings.
+
+    Args:
+        path: Directory holding the index files (created on first append)
+        dimensions: Embedding dimensionality
+    """
+
+    def __init__(self, path, dimensions):
+        self.path = Path(path)
+        self.dimensions = dimensions
+        self._lock = threading.Lock()
+        self._reset()
+
+    @property
+    def vectors_path(self):
+        return self.path / 'vectors.f32'
+
+    @property
+    def ids_path(self):
+        return self.path / 'ids.bin'
+
+    @property
+    def meta_path(self):
+        return self.path / 'meta.json'
+
+    def __len__(self):
+        self.refresh()
+        return int(self._valid.sum())
+
+    def append(self, deal_id, vector):
+        """Append (or supersede) the embedding for one deal"""
+        vector = self._normalize(vector)
+        with self._file_lock():
+            self._check_meta(create=True)
+            # Drop a partially written row left by an interrupted append
+            rows = self._row_count()
+            with open(self.vectors_path, 'ab') as vectors, open(self.ids_path, 'ab') as ids:
+                vectors.truncate(rows * self.dimensions * 4)
+                ids.truncate(rows * ID_SIZE)
+                vectors.write(vector.astype('<f4').tobytes())
+                ids.write(uuid.UUID(str(deal_id)).bytes)
+
+    def rebuild(self, items):
+        """
+        Replace the index with the given (deal_id, vector) pairs.
+
+        New files are written alongside and swapped in under the exclusive
+        lock, so readers keep serving the old index until the rebuild
+        completes and never see a vectors/ids pair from different builds.
+        Rows appended while the new files are being written are not carried
+        over.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        suffix = f'.{uuid.uuid4().hex}.tmp'
+        tmp_vectors = self.vectors_path.with_suffix(suffix)
+        tmp_ids = self.ids_path.with_suffix(suffix)
+        try:
+            with open(tmp_vectors, 'wb') as vectors, open(tmp_ids, 'wb') as ids:
+                for deal_id, vector in items:
+                    vectors.write(self._normalize(vector).astype('<f4').tobytes())
+                    ids.write(uuid.UUID(str(deal_id)).bytes)
+            with self._file_lock():
+                self.meta_path.write_text(json.dumps({'dimensions': self.dimensions}))
+                os.replace(tmp_vectors, self.vectors_path)
+                os.replace(tmp_ids, self.ids_path)
+        finally:
+            for tmp in (tmp_vectors, tmp_ids):
+                tmp.unlink(missing_ok=True)
+
+    def search(self, vector, k=10, exclude=()):
+        """
+        Return the k most similar deals to `vector`.
+
+        Returns:
+            list[tuple[uuid.UUID, float]]: (deal_id, cosine similarity), most
+            similar first.
+        """
+        self.refresh()
+        with self._lock:
+            vectors, ids, valid = self._vectors, self._ids, self._valid
+            positions = self._positions
+
+        if not len(ids):
+            return []
+
+        scores = np.asarray(vectors @ self._normalize(vector))
+        scores[~valid] = -np.inf
+        for deal_id in exclude:
+            row = positions.get(uuid.UUID(str(deal_id)))
+            if row is not None:
+                scores[row] = -np.inf
+
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[row], float(scores[row])) for row in top]
+
+    def refresh(self):
+        """Map rows appended or rebuilt by any process since the last call"""
+        with self._lock:
+            if not self.path.is_dir():
+                self._reset()
+                return
+            # Shared lock: appends and rebuilds hold it exclusively, so the
+            # vector and id files are always read as a consistent pair.
+            with self._file_lock(fcntl.LOCK_SH):
+                self._refresh_locked()
+
+    def _refresh_locked(self):
+        try:
+            inode = (self.vectors_path.stat().st_ino, self.ids_path.stat().st_ino)
+        except FileNotFoundError:
+            self._reset()
+            return
+        if inode != self._inode:
+            self._reset()
+            self._check_meta()
+            self._inode = inode
+
+        rows = self._row_count()
+        if rows == len(self._ids):
+            return
+        if rows < len(self._ids):
+            self._reset()
+            self._inode = inode
+            if not rows:
+                return
+
+        with open(self.ids_path, 'rb') as f:
+            f.seek(len(self._ids) * ID_SIZE)
+            raw = f.read((rows - len(self._ids)) * ID_SIZE)
+
+        valid = np.zeros(rows, dtype=bool)
+        valid[:len(self._valid)] = self._valid
+        start = len(self._ids)
+        for offset in range(0, len(raw), ID_SIZE):
+            deal_id = uuid.UUID(bytes=raw[offset:offset + ID_SIZE])
+            row = start + offset // ID_SIZE
+            previous = self._positions.get(deal_id)
+            if previous is not None:
+                valid[previous] = False
+            self._positions[deal_id] = row
+            self._ids.append(deal_id)
+            valid[row] = True
+
+        self._valid = valid
+        self._vectors = np.memmap(
+            self.vectors_path, dtype='<f4', mode='r', shape=(rows, self.dimensions)
+        )
+
+    def _reset(self):
+        self._inode = None
+        self._ids = []
+        self._positions = {}
+        self._valid = np.zeros(0, dtype=bool)
+        self._vectors = np.empty((0, self.dimensions), dtype=np.float32)
+
+    def _row_count(self):
+        try:
+            vector_rows = self.vectors_path.stat().st_size // (self.dimensions * 4)
+            id_rows = self.ids_path.stat().st_size // ID_SIZE
+        except FileNotFoundError:
+            return 0
+        return min(vector_rows, id_rows)
+
+    def _check_meta(self, create=False):
+        if not self.meta_path.exists():
+            if create:
+                self.meta_path.write_text(json.dumps({'dimensions': self.dimensions}))
+            return
+        dimensions = json.loads(self.meta_path.read_text())['dimensions']
+        if dimensions != self.dimensions:
+            raise ValueError(
+                f"Index at {self.path} has {dimensions} dimensions, expected {self.dimensions}; "
+                "run manage.py rebuild_embedding_index"
+            )
+
+    def _normalize(self, vector):
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dimensions:
+            raise ValueError(f"Expected a {self.dimensions}-dimensional vector, got {vector.shape[0]}")
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @contextmanager
+    def _file_lock(self, operation=fcntl.LOCK_EX):
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / 'lock', 'a') as lock:
+            fcntl.flock(lock, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
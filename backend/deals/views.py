@@ -12,19 +12,33 @@ Requirements:
 The rest of the ViewSet is complete.
 """
 
+import math
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 
+from core.http import ranged_file_response
+from . import exports, previews, services
 from .models import Deal
 from .serializers import (
     DealListSerializer,
     DealDetailSerializer,
     DealCreateSerializer,
+    SimilarDealSerializer,
 )
 
 
+EXPORT_FORMATS = {
+    'csv': ('text/csv', exports.stream_csv),
+    'ndjson': ('application/x-ndjson', exports.stream_ndjson),
+}
+
+
 class DealViewSet(viewsets.ModelViewSet):
     """
     API endpoints for Deal operations.
@@ -32,6 +46,15 @@ class DealViewSet(viewsets.ModelViewSet):
     queryset = Deal.objects.all()
     parser_classes = (MultiPartParser, FormParser)
     
+    # Actions that build their own non-JSON responses; content negotiation
+    # only picks the renderer for their error responses.
+    raw_response_actions = {'export', 'deck', 'page_preview'}
+    
+    def perform_content_negotiation(self, request, force=False):
+        if self.action in self.raw_response_actions:
+            force = True
+        return super().perform_content_negotiation(request, force=force)
+    
     def get_serializer_class(self):
         if self.action == 'create':
             return DealCreateSerializer
@@ -87,3 +110,179 @@ class DealViewSet(viewsets.ModelViewSet):
             'error_message': deal.error_message if deal.status == 'failed' else None,
             'processed_at': deal.processed_at,
         })
+
+    
+    @action(detail=True, methods=['get'], url_path='near-duplicates')
+    def near_duplicates(self, request, pk=None):
+        """
+        List deals whose decks are near-duplicates of this one.
+        
+        Query params:
+            threshold: minimum estimated Jaccard similarity, from
+                NEAR_DUPLICATE_MIN_THRESHOLD (0.6) to 1; lower values would
+                miss too many matches at the LSH candidate stage
+                (default NEAR_DUPLICATE_THRESHOLD)
+            limit: maximum number of results (default 10, max 100)
+        """
+        deal = self.get_object()
+        try:
+            threshold = float(request.query_params.get('threshold', settings.NEAR_DUPLICATE_THRESHOLD))
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            return Response(
+                {"error": "threshold must be a number and limit an integer"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        min_threshold = settings.NEAR_DUPLICATE_MIN_THRESHOLD
+        if not min_threshold <= threshold <= 1 or not 1 <= limit <= 100:
+            return Response(
+                {"error": f"threshold must be between {min_threshold} and 1 and limit between 1 and 100"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        matches = services.find_similar_deals(deal, threshold=threshold, limit=limit)
+        return Response(SimilarDealSerializer(matches, many=True).data)
+    
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """
+        List the deals with the most similar technology descriptions.
+        
+        Query params:
+            k: number of results (default 10, max 100)
+        """
+        deal = self.get_object()
+        try:
+            k = int(request.query_params.get('k', 10))
+        except ValueError:
+            k = 0
+        if not 1 <= k <= 100:
+            return Response(
+                {"error": "k must be an integer between 1 and 100"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        matches = services.find_comparable_deals(deal, k=k)
+        return Response(SimilarDealSerializer(matches, many=True).data)
+    
+    @action(detail=True, methods=['get'])
+    def deck(self, request, pk=None):
+        """Serve the original pitch deck PDF with HTTP Range support"""
+        deal = self.get_object()
+        if not deal.pitch_deck:
+            raise Http404("No pitch deck uploaded")
+        
+        etag = f'"{previews.ensure_content_hash(deal)}"'
+        return ranged_file_response(
+            request,
+            deal.pitch_deck.open('rb'),
+            deal.pitch_deck.size,
+            'application/pdf',
+            etag=etag,
+        )
+    
+    @action(detail=True, methods=['get'], url_path=r'pages/(?P<page>\d+)/preview')
+    def page_preview(self, request, pk=None, page=None):
+        """
+        Render a single deck page (1-indexed) to a WebP image.
+        
+        Query params:
+            width: one of PREVIEW_WIDTHS (default PREVIEW_DEFAULT_WIDTH)
+        """
+        deal = self.get_object()
+        if not deal.pitch_deck:
+            raise Http404("No pitch deck uploaded")
+        
+        try:
+            width = int(request.query_params.get('width', settings.PREVIEW_DEFAULT_WIDTH))
+        except ValueError:
+            width = None
+        if width not in settings.PREVIEW_WIDTHS:
+            return Response(
+                {"error": f"width must be one of {settings.PREVIEW_WIDTHS}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        etag = f'"{previews.ensure_content_hash(deal)}-{page}-{width}"'
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            try:
+                data, _ = previews.get_page_preview(deal, int(page), width)
+            except IndexError:
+                raise Http404("Page not found")
+            except ValueError as e:
+                return Response(
+                    {"error": str(e)},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            response = HttpResponse(data, content_type='image/webp')
+        
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, max-age=86400'
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream all matching deals with assessment and founders as CSV or NDJSON.
+        
+        Query params:
+            output: 'csv' (default) or 'ndjson'
+            status: comma-separated statuses
+            min_score / max_score: bounds on assessment overall_score
+            created_after / created_before: ISO date or datetime
+        """
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Unsupported output format: {output}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            queryset = self._filter_export_queryset(self.get_queryset(), request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        content_type, encoder = EXPORT_FORMATS[output]
+        rows = exports.iter_export_rows(exports.export_queryset(queryset))
+        response = StreamingHttpResponse(
+            exports.closing_stream(encoder(rows), rows),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="deals.{output}"'
+        return response
+    
+    def _filter_export_queryset(self, queryset, params):
+        """Apply export filters, raising ValueError on malformed values"""
+        statuses = [s for s in params.get('status', '').split(',') if s]
+        if statuses:
+            valid = {choice for choice, _ in Deal.STATUS_CHOICES}
+            unknown = set(statuses) - valid
+            if unknown:
+                raise ValueError(f"Unknown status: {', '.join(sorted(unknown))}")
+            queryset = queryset.filter(status__in=statuses)
+        
+        for param, lookup in (('min_score', 'gte'), ('max_score', 'lte')):
+            if params.get(param):
+                try:
+                    score = float(params[param])
+                except ValueError:
+                    score = math.nan
+                if not math.isfinite(score):
+                    raise ValueError(f"{param} must be a number")
+                queryset = queryset.filter(**{f'assessment__overall_score__{lookup}': score})
+        
+        for param, lookup in (('created_after', 'gte'), ('created_before', 'lte')):
+            if params.get(param):
+                value = params[param]
+                parsed = parse_datetime(value)
+                if parsed is None:
+                    parsed = parse_date(value)
+                    lookup = f'date__{lookup}'
+                if parsed is None:
+                    raise ValueError(f"{param} must be an ISO date or datetime")
+                queryset = queryset.filter(**{f'created_at__{lookup}': parsed})
+        
+        return queryset